@@ -9,66 +9,88 @@ Effects never need to know CC numbers -- only parameter names.
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from midi import MidiNote
 
 
 class Param:
     """
-    Descriptor for a named effect parameter.
+    Declaration marker for a named effect parameter and its default value.
 
-    Declare at the class level; the Effect metaclass collects them
-    into each instance's ``params`` dict.
+    Declare at the class level (speed = Param(default=1.0)). It holds no value
+    itself: Effect.__init_subclass__ records its attribute name once, gives
+    each declared name a slot in the instance's parameter-value list and
+    replaces the Param with a property reading that slot.
     """
+    __slots__ = ("default", "name")
 
     def __init__(self, default: float = 0.0):
         self.default = default
-        self.value = default
         self.name: Optional[str] = None
 
-    def reset(self) -> None:
-        self.value = self.default
-
     def __repr__(self) -> str:
-        return f"Param({self.name!r}, value={self.value}, default={self.default})"
+        return f"Param({self.name!r}, default={self.default})"
+
 
+def _param_property(i: int) -> property:
+    def fget(self: "Effect") -> float:
+        return self._param_values[i]
 
-class _EffectMeta(type):
-    """Metaclass that collects Param descriptors into a params registry."""
+    def fset(self: "Effect", value: float) -> None:
+        self._param_values[i] = value
 
-    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
-        instance = super().__call__(*args, **kwargs)
-        params: Dict[str, Param] = {}
-        for klass in reversed(type(instance).__mro__):
-            for attr_name, attr_val in vars(klass).items():
-                if isinstance(attr_val, Param):
-                    p = Param(default=attr_val.default)
-                    p.name = attr_name
-                    params[attr_name] = p
-        instance.params = params
-        return instance
+    return property(fget, fset)
 
 
-class Effect(metaclass=_EffectMeta):
+class Effect:
     """
     Base class for visual effects.
 
     Lifecycle (called by the main loop):
         setup(matrix)           -- once, before first frame
         activate()              -- each time the effect is switched to
-        draw(canvas, matrix, t) -- every frame
-        handle_note(note)       -- for each incoming MIDI note event
+        draw(canvas, matrix, t) -- every frame (unless frame_unchanged() says it can be skipped)
+        handle_notes(notes)     -- with each frame's batch of MIDI note events
 
     The MidiRouter updates parameters by calling set_param(name, value).
-    Subclasses read parameter values via self.params[name].value.
+    Subclasses read parameter values as plain attributes (self.speed) or via
+    self.get_param(name).
     """
 
-    params: Dict[str, Param]
+    # True if draw() itself repaints the whole canvas (e.g. starts with
+    # canvas.Clear()); the main loop then skips its own clear before draw().
+    CLEARS_CANVAS = False
+
+    _param_index: Dict[str, int] = {}
+    _param_defaults: Tuple[float, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # The declared params are fixed at class creation: start from the base
+        # class's layout (its Param attrs are already properties by now), add this
+        # class's own Params, and give each name a fixed index into the
+        # per-instance value list.
+        defaults: Dict[str, float] = {}
+        for base in reversed(cls.__mro__[1:]):
+            if issubclass(base, Effect):
+                defaults.update(zip(base._param_index, base._param_defaults))
+        for attr_name, attr_val in list(vars(cls).items()):
+            if isinstance(attr_val, Param):
+                attr_val.name = attr_name
+                defaults[attr_name] = attr_val.default
+        cls._param_index = {n: i for i, n in enumerate(defaults)}
+        cls._param_defaults = tuple(defaults.values())
+
+        # Expose each param as a plain attribute (self.speed) backed by its slot,
+        # so per-frame reads skip the name lookup in get_param().
+        for name, i in cls._param_index.items():
+            setattr(cls, name, _param_property(i))
 
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
+        self._param_values: List[float] = list(self._param_defaults)
 
     def setup(self, matrix: Any) -> None:
         """Called once before the first frame. Override to allocate buffers etc."""
@@ -80,18 +102,34 @@ class Effect(metaclass=_EffectMeta):
         """Render one frame at time *t* (seconds since start)."""
         raise NotImplementedError
 
+    def frame_unchanged(self, canvas: Any, matrix: Any, t: float) -> bool:
+        """
+        True if the frame at time *t* would be identical to the last one drawn.
+
+        Asked by the main loop before it clears the canvas; on True the loop
+        skips the clear, draw and swap for that frame. Override only when the
+        check is much cheaper than drawing.
+        """
+        return False
+
     def handle_note(self, note: MidiNote) -> None:
         """Handle a MIDI note event. Override if the effect reacts to notes."""
 
+    def handle_notes(self, notes: Iterable[MidiNote]) -> None:
+        """Handle a batch of note events in arrival order (calls handle_note for each)."""
+        handle_note = self.handle_note
+        for note in notes:
+            handle_note(note)
+
     def set_param(self, name: str, value: float) -> None:
         """Push a resolved parameter value (called by MidiRouter)."""
-        p = self.params.get(name)
-        if p is not None:
-            p.value = value
+        i = self._param_index.get(name)
+        if i is not None:
+            self._param_values[i] = value
 
     def get_param(self, name: str) -> float:
         """Read the current value of a named parameter."""
-        p = self.params.get(name)
-        if p is not None:
-            return p.value
+        i = self._param_index.get(name)
+        if i is not None:
+            return self._param_values[i]
         return 0.0
@@ -1,30 +1,71 @@
 #!/usr/bin/env -S python3 -u
 
+import os
 import sys
 import time
 import math
+import queue
+import logging
+import logging.handlers
 import random
 import argparse
+import threading
+from collections import namedtuple
 
-# Non-blocking keyboard check for space-to-next-effect (optional)
-def _read_key_nonblock():
-    """Return a single character if one is available, else None. Works on Windows and Unix."""
+# Keyboard reader for space-to-next-effect (optional). Runs on its own thread so
+# the frame loop only has to poll a queue, not make a select() call per frame.
+def _key_reader(keys, stop):
+    """Push single keypresses onto *keys* until *stop* is set. Works on Windows and Unix."""
     if sys.platform == "win32":
         try:
             import msvcrt
-            if msvcrt.kbhit():
-                return msvcrt.getch().decode("utf-8", errors="replace")
+            while not stop.is_set():
+                if msvcrt.kbhit():
+                    keys.put(msvcrt.getch().decode("utf-8", errors="replace"))
+                else:
+                    stop.wait(0.05)
         except Exception:
             pass
-        return None
-    # Unix: use select + read (terminal must be in cbreak mode for single-key)
+        return
+    # Unix: select with a timeout so *stop* is noticed, then read
+    # (terminal must be in cbreak mode for single-key)
     try:
         import select
-        if select.select([sys.stdin], [], [], 0.0)[0]:
-            return sys.stdin.read(1)
+        while not stop.is_set():
+            if select.select([sys.stdin], [], [], 0.25)[0]:
+                ch = sys.stdin.read(1)
+                if not ch:
+                    return  # EOF (e.g. stdin is /dev/null)
+                keys.put(ch)
     except Exception:
         pass
-    return None
+
+
+def _start_key_reader():
+    """Start the keyboard reader thread. Returns (keys, stop) -- a SimpleQueue and an Event."""
+    keys = queue.SimpleQueue()
+    stop = threading.Event()
+    threading.Thread(target=_key_reader, args=(keys, stop), name="key-reader", daemon=True).start()
+    return keys, stop
+
+
+def _start_log_listener():
+    """
+    Route the "psiwave" logger through a queue so stdout writes happen on a
+    listener thread instead of stalling the frame loop. Returns the listener
+    (stop it on exit to flush).
+    """
+    log_q = queue.SimpleQueue()
+    out = logging.StreamHandler(sys.stdout)
+    out.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_q, out)
+
+    logger = logging.getLogger("psiwave")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(log_q))
+    listener.start()
+    return listener
 
 
 def _stdin_cbreak_enter():
@@ -51,6 +92,7 @@ def _stdin_cbreak_exit(restore_fn):
     """Restore terminal after cbreak mode."""
     restore_fn()
 
+from effect import Effect
 from midi import (
     MidiInput, MidiRouter, CCBinding, LinearTransform, SigmoidTransform,
     RawCCTransform, Strategy,
@@ -63,8 +105,20 @@ from scanline_notes import ScanlineNotesEffect
 
 
 SWITCH_SECONDS = 30.0
+_TWO_PI = 2.0 * math.pi
 TARGET_FPS = 60.0
 
+# Frame pacing (integer nanoseconds): sleep until this close to the deadline, then spin the rest.
+PACING_SPIN_NS = 500_000
+PACING_MIN_SLEEP_NS = 1_000_000
+# Give up the CPU between spin checks where the OS supports it (POSIX); elsewhere
+# time.sleep(0) yields the rest of the timeslice.
+_spin_yield = getattr(os, "sched_yield", None) or (lambda: time.sleep(0))
+# Most consecutive frames skipped as unchanged before one is swapped anyway:
+# display backends may only do housekeeping on swap (the screen backend pumps
+# its window events in SwapOnVSync).
+MAX_SKIPPED_FRAMES = 15
+
 # Default CC assignments (overridable via CLI)
 CC_WAVE_SPEED = -1
 CC_WAVE_WAVELENGTH = 102
@@ -77,23 +131,62 @@ CC_TEXT_COLOR = 102
 
 _STARFIELD_SPAWN_PALETTE = ("white", "blue", "cyan", "yellow", "orange", "red")
 
+# Note-log lookup tables: pitch class per MIDI note number, state by is_on
+_PITCH_CLASS = tuple(n % 12 for n in range(128))
+_STATE_STR = ("off", "on")
+_NOTE_LOG_FMT = "[midi] note t=%7.3fs ch=%2d note=%3d vel=%3d pc=%2d state=%s"
+
+
+# Panel configuration in one place (applied to RGBMatrixOptions by _build_matrix)
+_MATRIX_OPTIONS = {
+    "rows": 40,
+    "cols": 80,
+    "hardware_mapping": "adafruit-hat",
+    "gpio_slowdown": 2,
+    "brightness": 60,
+    "pwm_bits": 8,
+    "pwm_lsb_nanoseconds": 250,
+    "multiplexing": 20,
+    "disable_hardware_pulsing": True,
+}
+
 
 def _build_matrix():
     from rgbmatrix import RGBMatrix, RGBMatrixOptions
 
+    # RGBMatrixOptions takes no constructor kwargs, so set them one by one
     options = RGBMatrixOptions()
-    options.rows = 40
-    options.cols = 80
-    options.hardware_mapping = "adafruit-hat"
-    options.gpio_slowdown = 2
-    options.brightness = 60
-    options.pwm_bits = 8
-    options.pwm_lsb_nanoseconds = 250
-    options.multiplexing = 20
-    options.disable_hardware_pulsing = True
+    for name, value in _MATRIX_OPTIONS.items():
+        setattr(options, name, value)
     return RGBMatrix(options=options)
 
 
+def _sync_mode(value: str) -> str:
+    """argparse type for --midi-sync: resolves the 'wavelength' alias to 'speed'."""
+    return "speed" if value == "wavelength" else value
+
+
+def _cpu_list(value: str) -> frozenset:
+    """argparse type for --cpu-affinity: comma-separated CPU indices, e.g. "2" or "1,2"."""
+    try:
+        cpus = frozenset(int(v) for v in value.split(",") if v.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated CPU numbers, got {value!r}")
+    if not cpus or min(cpus) < 0:
+        raise argparse.ArgumentTypeError(f"expected comma-separated CPU numbers, got {value!r}")
+    return cpus
+
+
+def _pin_to_cpus(cpus) -> None:
+    """Pin the calling thread (and threads it starts later) to *cpus*, where the OS allows it."""
+    try:
+        os.sched_setaffinity(0, cpus)
+    except (AttributeError, OSError) as e:
+        print(f"CPU affinity not applied ({e.__class__.__name__}: {e})")
+        return
+    print(f"Pinned render loop to CPU(s) {sorted(cpus)}")
+
+
 def get_parser():
     ap = argparse.ArgumentParser(description="psiwave-matrix demos")
     demo_group = ap.add_mutually_exclusive_group()
@@ -105,7 +198,8 @@ def get_parser():
     ap.add_argument("--midi-port", default=None, help="MIDI input port name (substring match).")
     ap.add_argument(
         "--midi-sync",
-        choices=("off", "wavelength", "speed", "spatial", "both"),
+        type=_sync_mode,
+        choices=("off", "speed", "spatial", "both"),
         default="speed",
         help=(
             "Sync wave parameters to MIDI clock (default: speed). "
@@ -149,9 +243,34 @@ def get_parser():
     ap.add_argument("--starfield-color-threshold", type=float, default=0.50, help="Sigmoid threshold for starfield color.")
     ap.add_argument("--starfield-color-steepness", type=float, default=10.0, help="Sigmoid steepness for starfield color.")
     ap.add_argument("--target-fps", type=float, default=TARGET_FPS, help="Target frame rate cap (0 = uncapped).")
+    ap.add_argument(
+        "--cpu-affinity", type=_cpu_list, default=None,
+        help=(
+            "Pin the render loop to these CPUs (comma-separated, Linux only), e.g. 2. "
+            "Keep it off the core rgbmatrix uses for its refresh thread (3 on multi-core Pis)."
+        ),
+    )
     return ap
 
 
+# Demo name -> effect class, in the order the demos cycle
+_EFFECT_CLASSES = {
+    "starfield": StarfieldEffect,
+    "sinwave": SinwaveEffect,
+    "multi_sinwaves": MultiSinwavesEffect,
+    "text_scroll": TextScrollEffect,
+    "scanline_notes": ScanlineNotesEffect,
+}
+
+_SOLO_FLAGS = (
+    ("solo_multi_sinwaves", "multi_sinwaves"),
+    ("solo_sinwave", "sinwave"),
+    ("solo_starfield", "starfield"),
+    ("solo_text_scroll", "text_scroll"),
+    ("solo_scanline_notes", "scanline_notes"),
+)
+
+
 # ---------------------------------------------------------------------------
 # CC binding builder
 # ---------------------------------------------------------------------------
@@ -164,16 +283,15 @@ def _clamp_cc(n: int) -> int:
     return n
 
 
-def _build_bindings(args, sinwave_fx, starfield_fx, text_fx):
-    """Create CCBinding list from CLI args. This is the ONE place CC numbers live."""
+def _build_bindings(args, sync, sinwave_fx, starfield_fx, text_fx):
+    """
+    Create CCBinding list from CLI args. This is the ONE place CC numbers live.
+    Effects passed as None (not running, e.g. under --solo-*) get no bindings.
+    """
     bindings = []
 
-    midi_sync_target = args.midi_sync
-    if midi_sync_target == "wavelength":
-        midi_sync_target = "speed"
-
     wave_speed_mode = str(getattr(args, "wave_speed_cc_mapping", "auto")).lower()
-    auto_enabled = midi_sync_target not in ("speed", "both")
+    auto_enabled = not sync.speed
     if wave_speed_mode == "on":
         cc_wave_speed_enabled = True
     elif wave_speed_mode == "off":
@@ -190,6 +308,13 @@ def _build_bindings(args, sinwave_fx, starfield_fx, text_fx):
     cc_text_speed = _clamp_cc(args.cc_text_speed)
     cc_text_color = _clamp_cc(args.cc_text_color)
 
+    if sinwave_fx is None:
+        cc_wave_speed = cc_wave_wavelength = cc_wave_color = cc_wave_phase = -1
+    if starfield_fx is None:
+        cc_starfield_speed = cc_starfield_color = -1
+    if text_fx is None:
+        cc_text_speed = cc_text_color = -1
+
     if cc_wave_speed_enabled and cc_wave_speed >= 0:
         bindings.append(CCBinding(
             ccs=[cc_wave_speed], target=sinwave_fx, param="speed",
@@ -211,7 +336,7 @@ def _build_bindings(args, sinwave_fx, starfield_fx, text_fx):
     if cc_wave_phase >= 0:
         bindings.append(CCBinding(
             ccs=[cc_wave_phase], target=sinwave_fx, param="phase_offset",
-            transform=LinearTransform(0.0, 2.0 * math.pi),
+            transform=LinearTransform(0.0, _TWO_PI),
         ))
 
     if cc_starfield_speed >= 0:
@@ -221,8 +346,8 @@ def _build_bindings(args, sinwave_fx, starfield_fx, text_fx):
         ))
 
     if cc_starfield_color >= 0:
-        sf_thr = max(0.0, min(1.0, float(args.starfield_color_threshold)))
-        sf_k = float(args.starfield_color_steepness)
+        sf_thr = max(0.0, min(1.0, args.starfield_color_threshold))
+        sf_k = args.starfield_color_steepness
         bindings.append(CCBinding(
             ccs=[cc_starfield_color], target=starfield_fx, param="color_amount",
             transform=SigmoidTransform(0.0, 1.0, threshold=sf_thr, steepness=sf_k),
@@ -243,218 +368,384 @@ def _build_bindings(args, sinwave_fx, starfield_fx, text_fx):
     return bindings
 
 
+# ---------------------------------------------------------------------------
+# MIDI clock sync
+# ---------------------------------------------------------------------------
+
+MIDI_CLOCK_PPQN = 24
+_INV_PPQN = 1.0 / MIDI_CLOCK_PPQN
+TEXT_SCROLL_PX_PER_BEAT = 8.0
+SCANLINE_CYCLE_BEATS = 8.0
+_INV_SCANLINE_CYCLE = 1.0 / SCANLINE_CYCLE_BEATS
+
+# Clock-sync settings, normalised once from the CLI args
+SyncConfig = namedtuple(
+    "SyncConfig",
+    "target enabled speed spatial phase_per_tick ref_bpm wl_min wl_max log note_log",
+)
+
+
+def _sync_config(args) -> SyncConfig:
+    """Build the SyncConfig shared by run() and _build_bindings()."""
+    target = args.midi_sync
+    # argparse already yields floats (type=float); only the fallbacks need handling
+    beats_per_cycle = args.midi_sync_beats_per_cycle
+    if beats_per_cycle <= 0.0:
+        beats_per_cycle = 1.0
+    return SyncConfig(
+        target=target,
+        enabled=target != "off",
+        speed=target in ("speed", "both"),
+        spatial=target in ("spatial", "both"),
+        phase_per_tick=_TWO_PI * _INV_PPQN / beats_per_cycle,
+        ref_bpm=args.midi_sync_ref_bpm if args.midi_sync_ref_bpm > 0 else 120.0,
+        wl_min=args.midi_sync_wavelength_min,
+        wl_max=args.midi_sync_wavelength_max,
+        log=args.midi_sync_log,
+        note_log=args.midi_note_log,
+    )
+
+
+# Effect hooks driven by the MIDI clock, bound once; None where that effect isn't running
+SyncTargets = namedtuple(
+    "SyncTargets",
+    "restart_wave set_wave_phase set_wave_wavelength set_spawn_color set_text_phase set_scanline_phase",
+)
+
+
+def _sync_targets(sinwave_fx, starfield_fx, text_fx, scanline_fx) -> SyncTargets:
+    wave = sinwave_fx is not None
+    return SyncTargets(
+        restart_wave=sinwave_fx.activate if wave else None,
+        set_wave_phase=sinwave_fx.set_external_phase if wave else None,
+        set_wave_wavelength=sinwave_fx.set_wavelength_mult if wave else None,
+        set_spawn_color=starfield_fx.set_spawn_color_type if starfield_fx is not None else None,
+        set_text_phase=text_fx.set_scroll_phase if text_fx is not None else None,
+        set_scanline_phase=scanline_fx.set_sweep_phase if scanline_fx is not None else None,
+    )
+
+
+def _shuffled_cycle(items):
+    """Yield *items* forever in freshly shuffled passes, never the same one twice in a row."""
+    rng = random.Random()
+    order = list(items)
+    last = None
+    while True:
+        rng.shuffle(order)
+        if len(order) > 1 and order[0] == last:
+            order[0], order[-1] = order[-1], order[0]
+        yield from order
+        last = order[-1]
+
+
+def _clock_sync_values(ticks: int, phase_per_tick: float):
+    """
+    Per-frame sync values from the MIDI clock tick count (24 PPQN), computed together.
+
+    Returns (text_scroll_px, scanline_phase, wave_phase):
+        text scroll -- 8 pixels per beat
+        scanline    -- 4 beats to cross the matrix (L->R), 8 beats full cycle (L->R->L)
+        wave phase  -- sinwave phase locked to the clock
+    """
+    beats = ticks * _INV_PPQN
+    return (
+        beats * TEXT_SCROLL_PX_PER_BEAT,
+        (beats % SCANLINE_CYCLE_BEATS) * _INV_SCANLINE_CYCLE,
+        ticks * phase_per_tick,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Main run loop
 # ---------------------------------------------------------------------------
 
 def run(args, matrix, use_windows_mm_midi: bool = False):
+    # After the matrix exists, so its refresh thread keeps its own placement
+    cpus = getattr(args, "cpu_affinity", None)
+    if cpus:
+        _pin_to_cpus(cpus)
+
     canvas = matrix.CreateFrameCanvas()
     w, h = int(matrix.width), int(matrix.height)
 
-    # Instantiate effects
-    sinwave_fx = SinwaveEffect(w, h)
-    starfield_fx = StarfieldEffect(w, h)
-    multi_sin_fx = MultiSinwavesEffect(w, h)
-    text_fx = TextScrollEffect(w, h)
-    scanline_fx = ScanlineNotesEffect(w, h)
-
-    all_effects = {
-        "sinwave": sinwave_fx,
-        "starfield": starfield_fx,
-        "multi_sinwaves": multi_sin_fx,
-        "text_scroll": text_fx,
-        "scanline_notes": scanline_fx,
-    }
-
-    # Determine which demos to cycle through
-    demos = []
-    if bool(getattr(args, "solo_multi_sinwaves", False)):
-        demos.append(("multi_sinwaves", multi_sin_fx))
-    elif bool(getattr(args, "solo_sinwave", False)):
-        demos.append(("sinwave", sinwave_fx))
-    elif bool(getattr(args, "solo_starfield", False)):
-        demos.append(("starfield", starfield_fx))
-    elif bool(getattr(args, "solo_text_scroll", False)):
-        demos.append(("text_scroll", text_fx))
-    elif bool(getattr(args, "solo_scanline_notes", False)):
-        demos.append(("scanline_notes", scanline_fx))
-    else:
-        demos.append(("starfield", starfield_fx))
-        demos.append(("sinwave", sinwave_fx))
-        demos.append(("multi_sinwaves", multi_sin_fx))
-        demos.append(("text_scroll", text_fx))
-        demos.append(("scanline_notes", scanline_fx))
+    # Determine which demos to cycle through, then instantiate only those;
+    # effects that aren't running stay None.
+    demo_names = list(_EFFECT_CLASSES)
+    for flag, name in _SOLO_FLAGS:
+        if bool(getattr(args, flag, False)):
+            demo_names = [name]
+            break
+    all_effects = {name: _EFFECT_CLASSES[name](w, h) for name in demo_names}
+    demos = list(all_effects.items())
+
+    sinwave_fx = all_effects.get("sinwave")
+    starfield_fx = all_effects.get("starfield")
+    text_fx = all_effects.get("text_scroll")
+    scanline_fx = all_effects.get("scanline_notes")
 
     # MIDI input
     midi = MidiInput(port_query=args.midi_port, use_windows_mm=use_windows_mm_midi)
 
-    midi_sync_target = args.midi_sync
-    if midi_sync_target == "wavelength":
-        midi_sync_target = "speed"
-    midi_sync_enabled = midi_sync_target != "off"
-    if midi_sync_enabled and not midi.is_enabled():
+    sync = _sync_config(args)
+    if sync.enabled and not midi.is_enabled():
         print("[midi] WARNING: --midi-sync enabled but MIDI input is disabled/unavailable.")
-    if midi_sync_enabled:
-        print(f"[midi] Sync mode: {midi_sync_target} (debug: --midi-sync-log clock or bpm)")
+    if sync.enabled:
+        print(f"[midi] Sync mode: {sync.target} (debug: --midi-sync-log clock or bpm)")
 
     # Build the declarative CC routing
-    bindings = _build_bindings(args, sinwave_fx, starfield_fx, text_fx)
+    bindings = _build_bindings(args, sync, sinwave_fx, starfield_fx, text_fx)
     router = MidiRouter(log_mode=args.midi_log)
     for b in bindings:
         router.add(b)
 
-    print(f"[midi] CC bindings: {router.describe()}")
-    print(f"[midi] log={args.midi_log} note_log={args.midi_note_log}")
+    print(
+        f"[midi] CC bindings: {router.describe()}\n"
+        f"[midi] log={args.midi_log} note_log={args.midi_note_log}"
+    )
 
-    # Setup all effects
+    # Setup all effects, plus one throwaway draw each so first-frame costs (lazy
+    # imports, glyph and font caches) land here rather than mid-show. That draw
+    # advances effect state (phases, stars, log timestamps), so each effect is
+    # set up again afterwards and the show starts from its untouched state.
     for fx in all_effects.values():
         fx.setup(matrix)
+        fx.draw(canvas, matrix, 0.0)
+        fx.setup(matrix)
+    canvas.Clear()
 
     # If we're doing MIDI logging, enable starfield debug
-    if args.midi_log != "none":
+    if args.midi_log != "none" and starfield_fx is not None:
         starfield_fx.set_debug(True)
 
     target_fps = float(getattr(args, "target_fps", TARGET_FPS))
-    start_time = time.time()
+    frame_budget_ns = round(1e9 / target_fps) if target_fps > 0.0 else 0
+    # Per-frame settings as plain locals for the loop
+    midi_enabled = midi.is_enabled()
+    midi_sync_enabled = sync.enabled and midi_enabled
+    note_log_all = sync.note_log == "all"
+    sync_log = sync.log
+    sync_log_enabled = sync_log != "none"
+    sync_log_clock = sync_log == "clock"
+    sync_speed = sync.speed and sinwave_fx is not None
+    sync_spatial = sync.spatial and sinwave_fx is not None
+    phase_per_tick = sync.phase_per_tick
+    ref_bpm = sync.ref_bpm
+    wl_min = sync.wl_min
+    wl_max = sync.wl_max
+    next_spawn_color = _shuffled_cycle(_STARFIELD_SPAWN_PALETTE).__next__
+
+    # Clock-sync hooks, unpacked to locals for the loop
+    sync_targets = _sync_targets(sinwave_fx, starfield_fx, text_fx, scanline_fx)
+    sw_restart, sw_set_phase, sw_set_wavelength, sf_set_spawn, ts_set_phase, sl_set_phase = sync_targets
+
+    note_logger = logging.getLogger("psiwave.midi")
+    # Note and router logs both go through the queued "psiwave" logger
+    log_listener = _start_log_listener() if note_log_all or args.midi_log != "none" else None
+
+    start_time = time.perf_counter()
+    # Draw and note handlers bound once per demo; switching just indexes these tables.
+    demo_draws = [fx.draw for _, fx in demos]
+    # None for effects that never report unchanged frames, so the loop skips the call
+    demo_unchanged_checks = [
+        fx.frame_unchanged if type(fx).frame_unchanged is not Effect.frame_unchanged else None
+        for _, fx in demos
+    ]
+    demo_note_handlers = [fx.handle_notes for _, fx in demos]
+    demo_needs_clear = [not fx.CLEARS_CANVAS for _, fx in demos]
     active_idx = 0
+    active_draw = demo_draws[active_idx]
+    active_frame_unchanged = demo_unchanged_checks[active_idx]
+    active_needs_clear = demo_needs_clear[active_idx]
+    active_handle_notes = demo_note_handlers[active_idx]
     demos[active_idx][1].activate()
+    # Time-based cycling only matters with more than one demo.
+    next_switch_t = start_time + SWITCH_SECONDS if len(demos) > 1 else math.inf
+
+    def switch_to(new_idx: int, reason: str) -> None:
+        """The one place a demo switch happens: activate it and restart the switch timer."""
+        nonlocal active_idx, active_draw, active_frame_unchanged, active_needs_clear, active_handle_notes, next_switch_t
+        if new_idx == active_idx:
+            return
+        active_idx = new_idx
+        active_draw = demo_draws[active_idx]
+        active_frame_unchanged = demo_unchanged_checks[active_idx]
+        active_needs_clear = demo_needs_clear[active_idx]
+        active_handle_notes = demo_note_handlers[active_idx]
+        demos[active_idx][1].activate()
+        next_switch_t = time.perf_counter() + SWITCH_SECONDS
+        print(f"Switched to: {demos[active_idx][0]} ({reason})")
 
     # Optional: cbreak mode on Unix so keys are read without Enter
     cbreak_ok, restore_stdin = _stdin_cbreak_enter()
+    stdin_piped = sys.stdin is not None and not sys.stdin.isatty()
+    if cbreak_ok or sys.platform == "win32" or stdin_piped:
+        # Piped stdin is read line by line (keys arrive as each line does); the
+        # reader exits by itself at EOF, e.g. on /dev/null.
+        keys, stop_keys = _start_key_reader()
+    else:
+        # A terminal we can't put in cbreak mode: no single-key input, so don't
+        # park a reader thread on it; the queue just stays empty.
+        print("[keys] keyboard control disabled (could not set terminal to cbreak mode)")
+        keys, stop_keys = queue.SimpleQueue(), threading.Event()
     print(
         f"Starting demo: {demos[active_idx][0]} (switch every {SWITCH_SECONDS:.0f}s). "
         f"Press 'n' for next effect. CTRL-C to stop."
     )
 
     try:
-        last_clock_log_t = -1e9
-        last_beat_index = None
+        next_clock_log_t = 0.0
+        next_sync_error_log_t = 0.0  # a failing sync would otherwise log every frame
+        last_bpm_q = None  # BPM (0.1 resolution) the wavelength was last synced to
+        phase_overrides_set = False  # clock phases pushed into effects since the last release
+        # Bound once; clear_canvas is rebound whenever the swap hands back the other buffer
+        swap_on_vsync = matrix.SwapOnVSync
+        clear_canvas = canvas.Clear
+        skipped_frames = 0
+        next_deadline_ns = time.perf_counter_ns()
 
         while True:
-            frame_start = time.time()
+            frame_start = time.perf_counter()
             t_point = frame_start - start_time
 
-            # Drain MIDI
-            cc_msgs = midi.drain(now_t=t_point)
-            note_msgs = midi.drain_notes()
+            # Drain MIDI (skipped outright when no port was opened)
+            if midi_enabled:
+                cc_msgs = midi.drain(now_t=t_point)
+                note_msgs = midi.drain_notes()  # empty tuple when nothing is queued
+            else:
+                cc_msgs = note_msgs = ()
 
             # Note logging + dispatch to active effect
             if note_msgs:
-                if args.midi_note_log == "all":
+                if note_log_all:
                     for n in note_msgs:
-                        state = "on" if n.is_on else "off"
-                        pc = n.note % 12 if 0 <= n.note <= 127 else -1
-                        print(
-                            f"[midi] note t={n.t:7.3f}s ch={n.channel:2d} "
-                            f"note={n.note:3d} vel={n.velocity:3d} pc={pc:2d} state={state}"
+                        pc = _PITCH_CLASS[n.note] if 0 <= n.note <= 127 else -1
+                        note_logger.info(
+                            _NOTE_LOG_FMT, n.t, n.channel, n.note, n.velocity, pc, _STATE_STR[n.is_on],
                         )
-                active_fx = demos[active_idx][1]
-                for n in note_msgs:
-                    try:
-                        active_fx.handle_note(n)
-                    except Exception:
-                        pass
+                try:
+                    active_handle_notes(note_msgs)
+                except Exception as e:
+                    note_logger.warning("[midi] %s.handle_notes failed: %s", demos[active_idx][0], e)
 
             # MIDI clock sync (orchestration between clock and effects)
             if midi_sync_enabled:
-                running, bpm, start_pulse = midi.clock_state()
-
-                if start_pulse:
-                    try:
-                        sinwave_fx.activate()
-                    except Exception:
-                        pass
-                    last_beat_index = None
-
-                if running:
-                    _, _, ticks, last_dt, win = midi.clock_debug_state()
-
-                    # Debug: log when clock is running (so you can confirm sync is active)
-                    if args.midi_sync_log == "clock" and (t_point - last_clock_log_t) >= 2.0:
-                        last_clock_log_t = t_point
-                        bpm_s = f"{float(bpm):.2f}" if isinstance(bpm, (int, float)) else "?"
-                        dt_s = f"{float(last_dt):.4f}" if isinstance(last_dt, (int, float)) else "?"
-                        print(f"[midi] clock running=True bpm={bpm_s} ticks={ticks} last_dt={dt_s}s win={win} sync={midi_sync_target}")
-
-                    # Beat edge: 24 PPQN -> one beat every 24 ticks
-                    beat_index = int(ticks) // 24
-                    if beat_index != last_beat_index:
-                        last_beat_index = beat_index
-                        new_color = random.choice(_STARFIELD_SPAWN_PALETTE)
-                        starfield_fx.set_spawn_color_type(new_color)
-
-                    # Text scroll phase from beats (8 pixels per beat)
-                    text_scroll_phase_px = (float(ticks) / 24.0) * 8.0
-                    text_fx.set_scroll_phase(text_scroll_phase_px)
-
-                    # Scanline: 4 beats to cross matrix (L→R), 8 beats full cycle (L→R→L)
-                    beats = float(ticks) / 24.0
-                    bar_phase = (beats % 8.0) / 8.0
-                    scanline_fx.set_sweep_phase(bar_phase)
-
-                    # Speed sync: lock sinwave phase to clock
-                    if midi_sync_target in ("speed", "both"):
-                        beats_per_cycle = float(args.midi_sync_beats_per_cycle)
-                        if beats_per_cycle <= 0.0:
-                            beats_per_cycle = 1.0
-                        phase = (2.0 * math.pi) * ((float(ticks) / 24.0) / beats_per_cycle)
-                        sinwave_fx.set_external_phase(phase)
-
-                    # Spatial wavelength sync
-                    if midi_sync_target in ("spatial", "both") and isinstance(bpm, (int, float)) and bpm > 0.0:
-                        ref = float(args.midi_sync_ref_bpm) if args.midi_sync_ref_bpm > 0 else 120.0
-                        mult = ref / float(bpm)
-                        mult = max(float(args.midi_sync_wavelength_min), min(float(args.midi_sync_wavelength_max), mult))
-                        sinwave_fx.set_wavelength_mult(mult)
-                else:
-                    # Clock not running -- release overrides
-                    sinwave_fx.set_external_phase(None)
-                    text_fx.set_scroll_phase(None)
-                    scanline_fx.set_sweep_phase(None)
-
-                    if args.midi_sync_log == "clock" and (t_point - last_clock_log_t) >= 1.0:
-                        last_clock_log_t = t_point
-                        r, b, ticks, last_dt, win = midi.clock_debug_state()
-                        bpm_s = f"{float(b):.2f}" if isinstance(b, (int, float)) else "?"
-                        dt_s = f"{float(last_dt):.4f}" if isinstance(last_dt, (int, float)) else "?"
-                        print(f"[midi] clock running={r} bpm={bpm_s} ticks={ticks} last_dt={dt_s}s win={win} sync={midi_sync_target}")
-                    elif args.midi_sync_log == "bpm" and (t_point - last_clock_log_t) >= 1.0:
-                        last_clock_log_t = t_point
-                        if isinstance(bpm, (int, float)) and bpm > 0.0:
-                            print(f"[midi] clock running bpm={float(bpm):.2f} sync={midi_sync_target}")
-                        else:
-                            r, _, ticks, _, win = midi.clock_debug_state()
-                            if r:
-                                print(f"[midi] clock running (estimating...) ticks={ticks} win={win} sync={midi_sync_target}")
+                # One guard for the whole block: a failing hook is logged, not fatal
+                try:
+                    running, bpm, start_pulse = midi.clock_state()
+
+                    if start_pulse:
+                        if sw_restart is not None:
+                            sw_restart()
+
+                    if running:
+                        ticks = midi.tick_count()
+
+                        # Debug: log when clock is running (so you can confirm sync is active)
+                        if sync_log_clock and t_point >= next_clock_log_t:
+                            next_clock_log_t = t_point + 2.0
+                            _, _, _, last_dt, win = midi.clock_debug_state()
+                            bpm_s = f"{bpm:.2f}" if bpm > 0.0 else "?"
+                            dt_s = f"{float(last_dt):.4f}" if isinstance(last_dt, (int, float)) else "?"
+                            print(f"[midi] clock running=True bpm={bpm_s} ticks={ticks} last_dt={dt_s}s win={win} sync={sync.target}")
+
+                        # Beat edge (flagged by MidiInput on Start and whenever the tick count reaches a beat boundary)
+                        if midi.beat_pulse():
+                            new_color = next_spawn_color()
+                            if sf_set_spawn is not None:
+                                sf_set_spawn(new_color)
+
+                        # Text scroll, scanline sweep and (speed sync) sinwave phase from the clock
+                        text_px, bar_phase, wave_phase = _clock_sync_values(ticks, phase_per_tick)
+                        phase_overrides_set = True
+                        if ts_set_phase is not None:
+                            ts_set_phase(text_px)
+                        if sl_set_phase is not None:
+                            sl_set_phase(bar_phase)
+                        if sync_speed:
+                            sw_set_phase(wave_phase)
+
+                        # Spatial wavelength sync
+                        if sync_spatial and bpm > 0.0:
+                            bpm_q = round(bpm, 1)
+                            if bpm_q != last_bpm_q:
+                                last_bpm_q = bpm_q
+                                mult = ref_bpm / bpm_q
+                                mult = max(wl_min, min(wl_max, mult))
+                                sw_set_wavelength(mult)
+                    else:
+                        # Clock stopped -- release the overrides once, on the transition
+                        if phase_overrides_set:
+                            phase_overrides_set = False
+                            if sw_set_phase is not None:
+                                sw_set_phase(None)
+                            if ts_set_phase is not None:
+                                ts_set_phase(None)
+                            if sl_set_phase is not None:
+                                sl_set_phase(None)
+
+                        if sync_log_enabled and t_point >= next_clock_log_t:
+                            next_clock_log_t = t_point + 1.0
+                            if sync_log_clock:
+                                r, b, ticks, last_dt, win = midi.clock_debug_state()
+                                bpm_s = f"{b:.2f}" if b > 0.0 else "?"
+                                dt_s = f"{float(last_dt):.4f}" if isinstance(last_dt, (int, float)) else "?"
+                                print(f"[midi] clock running={r} bpm={bpm_s} ticks={ticks} last_dt={dt_s}s win={win} sync={sync.target}")
+                            elif bpm > 0.0:
+                                print(f"[midi] clock running bpm={bpm:.2f} sync={sync.target}")
+                            else:
+                                r, _, ticks, _, win = midi.clock_debug_state()
+                                if r:
+                                    print(f"[midi] clock running (estimating...) ticks={ticks} win={win} sync={sync.target}")
+                except Exception as e:
+                    if t_point >= next_sync_error_log_t:
+                        next_sync_error_log_t = t_point + 1.0
+                        note_logger.warning("[midi] clock sync failed: %s", e)
 
             # Route CC messages through the declarative bindings
-            router.process(cc_msgs)
-
-            # Keyboard: switch to next effect and reset timer
-            key = _read_key_nonblock()
+            if cc_msgs:
+                router.process(cc_msgs)
+                # A CC may have moved the wavelength; re-apply the sync next frame.
+                last_bpm_q = None
+
+            # Demo switching: a keypress takes priority over the timer, and
+            # either one restarts the timer, so at most one switch per frame.
+            key = keys.get_nowait() if not keys.empty() else None
             if key in ("n", "N", " "):
-                active_idx = (active_idx + 1) % len(demos)
-                demos[active_idx][1].activate()
-                start_time = time.time()
-                print(f"Switched to: {demos[active_idx][0]}")
-
-            # Demo switching (time-based)
-            next_idx = int(t_point // SWITCH_SECONDS) % len(demos)
-            if next_idx != active_idx:
-                active_idx = next_idx
-                demos[active_idx][1].activate()
-                print(f"Switched to: {demos[active_idx][0]}")
+                switch_to((active_idx + 1) % len(demos), "key")
+            elif frame_start >= next_switch_t:
+                switch_to((active_idx + 1) % len(demos), "timer")
 
             # Render
-            canvas.Clear()
-            demos[active_idx][1].draw(canvas, matrix, t_point)
-            canvas = matrix.SwapOnVSync(canvas)
-
-            if target_fps > 0.0:
-                frame_budget = 1.0 / target_fps
-                elapsed = time.time() - frame_start
-                if elapsed < frame_budget:
-                    time.sleep(frame_budget - elapsed)
+            if (
+                active_frame_unchanged is not None
+                and skipped_frames < MAX_SKIPPED_FRAMES
+                and active_frame_unchanged(canvas, matrix, t_point)
+            ):
+                # Same frame as on screen: no clear, draw or swap
+                skipped_frames += 1
+            else:
+                skipped_frames = 0
+                if active_needs_clear:
+                    clear_canvas()
+                active_draw(canvas, matrix, t_point)
+                canvas = swap_on_vsync(canvas)
+                clear_canvas = canvas.Clear
+
+            if frame_budget_ns:
+                # Each frame is due one budget after the previous deadline (not after
+                # this frame started), so sleep overshoot doesn't accumulate as drift.
+                # Deadlines are integer ns, so long sessions don't gather float rounding.
+                next_deadline_ns += frame_budget_ns
+                now_ns = time.perf_counter_ns()
+                delay_ns = next_deadline_ns - now_ns
+                if delay_ns < -frame_budget_ns:
+                    # Fell more than a frame behind: resync instead of bursting to catch up.
+                    next_deadline_ns = now_ns
+                else:
+                    if delay_ns > PACING_MIN_SLEEP_NS:
+                        time.sleep((delay_ns - PACING_SPIN_NS) * 1e-9)
+                    while time.perf_counter_ns() < next_deadline_ns:
+                        _spin_yield()
 
     except KeyboardInterrupt:
         print("\nExiting...")
@@ -466,6 +757,9 @@ def run(args, matrix, use_windows_mm_midi: bool = False):
             raise
         matrix.Clear()
     finally:
+        stop_keys.set()
+        if log_listener is not None:
+            log_listener.stop()
         _stdin_cbreak_exit(restore_stdin)
 
 
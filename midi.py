@@ -3,7 +3,7 @@
 MIDI infrastructure for psiwave-matrix.
 
 Contains:
-- MidiCC / MidiNote dataclasses
+- MidiCC / MidiNote message tuples
 - MidiInput: non-blocking MIDI input with clock tracking
 - Transform functions for mapping 0..1 to parameter ranges
 - CCResolver: aggregation strategies for multi-CC inputs
@@ -15,10 +15,11 @@ from __future__ import annotations
 
 import sys
 import math
+import logging
 import time
-from dataclasses import dataclass, field
+from collections import deque
 from enum import Enum
-from typing import Optional, List, Tuple, Callable, Dict, Any, Union
+from typing import Optional, List, Tuple, Callable, Dict, FrozenSet, Any, Union, Sequence, NamedTuple
 
 
 # ---------------------------------------------------------------------------
@@ -34,6 +35,15 @@ def cc_unit(v: int) -> float:
     return v / 127.0
 
 
+# cc_unit() for every 7-bit value, for callers holding an already-masked int
+_CC_UNIT: Tuple[float, ...] = tuple(cc_unit(v) for v in range(128))
+
+
+def _cc_unit_lookup(v: int) -> float:
+    """cc_unit() via the table; clamps like cc_unit() for values fed in by hand."""
+    return _CC_UNIT[min(max(v, 0), 127)]
+
+
 def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * t
 
@@ -46,6 +56,9 @@ def clamp01(x: float) -> float:
     return float(x)
 
 
+_exp = math.exp
+
+
 def sigmoid01(x: float, *, threshold: float = 0.5, steepness: float = 10.0) -> float:
     """
     Sigmoid curve mapping x in [0,1] -> y in [0,1].
@@ -67,9 +80,9 @@ def sigmoid01(x: float, *, threshold: float = 0.5, steepness: float = 10.0) -> f
 
     z = k * (x - t)
     if z >= 0.0:
-        ez = math.exp(-z)
+        ez = _exp(-z)
         return 1.0 / (1.0 + ez)
-    ez = math.exp(z)
+    ez = _exp(z)
     return ez / (1.0 + ez)
 
 
@@ -77,8 +90,7 @@ def sigmoid01(x: float, *, threshold: float = 0.5, steepness: float = 10.0) -> f
 # MIDI message types
 # ---------------------------------------------------------------------------
 
-@dataclass(frozen=True)
-class MidiCC:
+class MidiCC(NamedTuple):
     """Minimal representation of a MIDI Control Change message."""
     channel: int  # 1-16
     control: int  # 0-127
@@ -86,8 +98,7 @@ class MidiCC:
     t: float      # seconds (relative to program start)
 
 
-@dataclass(frozen=True)
-class MidiNote:
+class MidiNote(NamedTuple):
     """Minimal representation of a MIDI NoteOn/NoteOff message."""
     channel: int    # 1-16
     note: int       # 0-127
@@ -96,6 +107,30 @@ class MidiNote:
     t: float        # seconds (relative to program start)
 
 
+# Number of clock-tick intervals averaged for the BPM estimate (4 beats at 24 PPQN)
+_CLOCK_WINDOW = 96
+
+# Most note events held between drain_notes() calls; older ones are dropped
+_NOTE_QUEUE_MAX = 1024
+
+# Most raw messages waiting for drain(); under a flood the oldest are dropped
+_INBOX_MAX = 2048
+
+# Status byte -> (message type, 1-based channel) for channel-voice messages
+_STATUS_DECODE: Tuple[Tuple[int, int], ...] = tuple((s & 0xF0, (s & 0x0F) + 1) for s in range(256))
+
+# Most messages drain() handles per call; the rest wait in the inbox for the
+# next frame. At 60 FPS that still allows ~3840 messages/s.
+_DRAIN_MAX_MSGS = 64
+
+# Router log output; the app routes the "psiwave" logger through a queue
+# listener so formatting and stdout writes happen off the frame loop.
+_log = logging.getLogger("psiwave.midi")
+
+# Shared empty result for drain()/drain_notes() on frames with nothing pending
+_NO_EVENTS: Tuple[()] = ()
+
+
 # ---------------------------------------------------------------------------
 # MidiInput (non-blocking MIDI, was MidiCCIn)
 # ---------------------------------------------------------------------------
@@ -104,6 +139,9 @@ class MidiInput:
     """
     Non-blocking MIDI input using python-rtmidi.
 
+    Incoming messages are timestamped on rtmidi's callback thread and queued;
+    drain() decodes them (and updates clock state) on the caller's thread.
+
     Default: first available MIDI input port, any channel.
     If MIDI isn't available, becomes a no-op so rendering continues.
     """
@@ -113,13 +151,33 @@ class MidiInput:
         self._clock_ppqn = 24
         self._clock_running = False
         self._clock_last_tick_t: Optional[float] = None
-        self._clock_tick_dts: List[float] = []
-        self._clock_bpm: Optional[float] = None
+        # Recent tick intervals for the BPM estimate, with their running sum
+        self._clock_tick_dts: deque = deque(maxlen=_CLOCK_WINDOW)
+        self._clock_tick_dt_sum = 0.0
+        self._clock_bpm = 0.0  # 0.0 until estimated
         self._clock_start_pulse = False
+        self._clock_beat_pulse = False
         self._clock_tick_count = 0
         self._clock_last_dt: Optional[float] = None
-        self._note_queue: List[MidiNote] = []
+        # Bounded so a caller that stops draining (oldest notes are dropped)
+        # can't grow it without limit. drain_notes() hands out _note_queue and
+        # swaps in the spare (and vice versa), so draining allocates nothing.
+        self._note_queue: deque = deque(maxlen=_NOTE_QUEUE_MAX)
+        self._spare_note_queue: deque = deque(maxlen=_NOTE_QUEUE_MAX)
+        # drain() returns this same list each call, cleared first.
+        self._cc_out: List[MidiCC] = []
         self._clock_first_tick_logged = False
+        # (raw message, perf_counter stamp) pairs; appended by the rtmidi callback
+        # thread, popped by drain(). deque append/popleft are atomic, so no lock.
+        self._inbox: deque = deque(maxlen=_INBOX_MAX)
+        self._inbox_dropped = 0  # messages pushed out by maxlen, reported by drain()
+        self._poll_input = False
+        # System realtime status byte (0xF8..0xFF) -> handler(msg_t); None = ignored
+        self._realtime: List[Optional[Callable[[float], None]]] = [None] * 256
+        self._realtime[0xF8] = self._clock_on_tick
+        self._realtime[0xFA] = self._clock_on_start
+        self._realtime[0xFB] = self._clock_on_continue
+        self._realtime[0xFC] = self._clock_on_stop
 
         try:
             import rtmidi  # type: ignore
@@ -219,10 +277,11 @@ class MidiInput:
                     best_i = i
             chosen_idx = best_i
 
-        print("[midi] available inputs:")
+        lines = ["[midi] available inputs:"]
         for i, n in enumerate(ports):
             marker = " <==" if i == chosen_idx else ""
-            print(f"[midi]   {i:2d}: {n}{marker}")
+            lines.append(f"[midi]   {i:2d}: {n}{marker}")
+        print("\n".join(lines))
 
         try:
             self._midiin.open_port(chosen_idx)
@@ -231,25 +290,57 @@ class MidiInput:
             self._midiin = None
             return
 
+        try:
+            self._midiin.set_callback(self._on_midi)
+        except Exception:
+            # No callback support: drain() polls get_message() instead.
+            self._poll_input = True
+
         port_name = ports[chosen_idx]
         print(f"[midi] listening on '{port_name}', any channel (CC + clock)")
 
+    def _on_midi(self, event: Tuple[List[int], float], data: Any = None) -> None:
+        """rtmidi callback (runs on rtmidi's thread): stamp the message and queue it."""
+        inbox = self._inbox
+        if len(inbox) == _INBOX_MAX:
+            self._inbox_dropped += 1
+        inbox.append((event[0], time.perf_counter()))
+
+    def _poll_into_inbox(self) -> None:
+        """Fallback for rtmidi builds without set_callback(): queue what get_message() has."""
+        get_message = self._midiin.get_message
+        inbox = self._inbox
+        stamp = time.perf_counter()
+        # At most one inbox-full per call; anything beyond stays queued in rtmidi
+        for _ in range(_INBOX_MAX - len(inbox)):
+            msg = get_message()
+            if not msg:
+                break
+            inbox.append((msg[0], stamp))
+
     # -- Clock handling ------------------------------------------------------
 
-    def _clock_on_start(self) -> None:
+    def _clock_on_start(self, now_t: float) -> None:
         self._clock_running = True
         self._clock_last_tick_t = None
         self._clock_tick_dts.clear()
-        self._clock_bpm = None
+        self._clock_tick_dt_sum = 0.0
+        self._clock_bpm = 0.0
         self._clock_start_pulse = True
+        self._clock_beat_pulse = True  # Start is beat 0; later beats fire from _clock_on_tick
         self._clock_tick_count = 0
         self._clock_last_dt = None
 
-    def _clock_on_stop(self) -> None:
+    def _clock_on_continue(self, now_t: float) -> None:
+        self._clock_running = True
+
+    def _clock_on_stop(self, now_t: float) -> None:
         self._clock_running = False
         self._clock_last_tick_t = None
         self._clock_tick_dts.clear()
-        self._clock_bpm = None
+        self._clock_tick_dt_sum = 0.0
+        self._clock_bpm = 0.0
+        self._clock_beat_pulse = False
         self._clock_tick_count = 0
         self._clock_last_dt = None
 
@@ -260,27 +351,48 @@ class MidiInput:
         if not self._clock_running:
             self._clock_running = True
         self._clock_tick_count += 1
+        if self._clock_tick_count % self._clock_ppqn == 0:
+            # Beat boundary (ticks 24, 48, ...), the same place _clock_sync_values() puts it
+            self._clock_beat_pulse = True
         if self._clock_last_tick_t is not None:
             dt = now_t - self._clock_last_tick_t
             self._clock_last_dt = dt
             if 0.002 <= dt <= 0.25:
-                self._clock_tick_dts.append(dt)
-                if len(self._clock_tick_dts) > 96:
-                    del self._clock_tick_dts[:-96]
-                if len(self._clock_tick_dts) >= 4:
-                    avg_dt = sum(self._clock_tick_dts) / len(self._clock_tick_dts)
+                dts = self._clock_tick_dts
+                n = len(dts)
+                if n == _CLOCK_WINDOW:
+                    self._clock_tick_dt_sum -= dts[0]  # about to be evicted
+                else:
+                    n += 1
+                dts.append(dt)
+                self._clock_tick_dt_sum += dt
+                if n >= 4:
+                    avg_dt = self._clock_tick_dt_sum / n
                     if avg_dt > 0:
                         bps = 1.0 / (avg_dt * float(self._clock_ppqn))
                         self._clock_bpm = 60.0 * bps
         self._clock_last_tick_t = now_t
 
-    def clock_state(self) -> Tuple[bool, Optional[float], bool]:
-        """Returns (running, bpm, start_pulse). start_pulse is True once after MIDI Start."""
+    def clock_state(self) -> Tuple[bool, float, bool]:
+        """
+        Returns (running, bpm, start_pulse). bpm is 0.0 until there are enough
+        ticks to estimate it; start_pulse is True once after MIDI Start.
+        """
         sp = self._clock_start_pulse
         self._clock_start_pulse = False
         return self._clock_running, self._clock_bpm, sp
 
-    def clock_debug_state(self) -> Tuple[bool, Optional[float], int, Optional[float], int]:
+    def beat_pulse(self) -> bool:
+        """True once for each beat started since the last call."""
+        bp = self._clock_beat_pulse
+        self._clock_beat_pulse = False
+        return bp
+
+    def tick_count(self) -> int:
+        """Clock ticks received since MIDI Start (or since the clock was first seen)."""
+        return self._clock_tick_count
+
+    def clock_debug_state(self) -> Tuple[bool, float, int, Optional[float], int]:
         """Returns (running, bpm, tick_count, last_dt, window_len)."""
         return (
             self._clock_running,
@@ -292,72 +404,91 @@ class MidiInput:
 
     # -- Message draining ----------------------------------------------------
 
-    def drain(self, now_t: float) -> List[MidiCC]:
-        """Drain pending MIDI messages; returns CCs and updates clock state."""
+    def drain(self, now_t: float, max_msgs: int = _DRAIN_MAX_MSGS) -> Sequence[MidiCC]:
+        """
+        Drain pending MIDI messages; returns CCs and updates clock state.
+        Events are stamped with their arrival time, on the same clock as now_t.
+        At most max_msgs are handled per call, bounding the time one frame can
+        spend here during a MIDI flood; the remainder is left for the next call.
+        The returned list is reused by the next call, so consume it first.
+        """
         if self._midiin is None:
-            return []
-
-        out: List[MidiCC] = []
+            return _NO_EVENTS
+        if self._poll_input:
+            self._poll_into_inbox()
+
+        if self._inbox_dropped:
+            dropped = self._inbox_dropped
+            self._inbox_dropped = 0
+            _log.warning("[midi] input backlog: dropped %d oldest message(s)", dropped)
+
+        inbox = self._inbox
+        if not inbox:
+            return _NO_EVENTS
+        realtime = self._realtime
+        decode = _STATUS_DECODE
+        # Offset from perf_counter stamps to the caller's time base
+        to_now_t = now_t - time.perf_counter()
+        out = self._cc_out
+        out.clear()
+        emit_cc = out.append
+        queue_note = self._note_queue.append
         try:
-            while True:
-                msg = self._midiin.get_message()
-                if not msg:
-                    break
-                data = msg[0]
-                if not data or len(data) < 1:
+            for _ in range(min(len(inbox), max_msgs)):
+                data, stamp = inbox.popleft()
+                if not data:
                     continue
+                msg_t = stamp + to_now_t
 
-                status = int(data[0]) & 0xFF
+                status = data[0] & 0xFF
 
-                if status == 0xF8:
-                    self._clock_on_tick(now_t=now_t)
-                    continue
-                if status == 0xFA:
-                    self._clock_on_start()
-                    continue
-                if status == 0xFB:
-                    self._clock_running = True
-                    continue
-                if status == 0xFC:
-                    self._clock_on_stop()
-                    continue
                 if status >= 0xF8:
+                    handler = realtime[status]
+                    if handler is not None:
+                        handler(msg_t)
                     continue
 
                 if len(data) < 3:
                     continue
-                msg_type = status & 0xF0
-                ch = (status & 0x0F) + 1
+                msg_type, ch = decode[status]
+                # rtmidi delivers a list of ints; no int() coercion needed
+                d1 = data[1] & 0x7F
+                d2 = data[2] & 0x7F
 
                 if msg_type == 0x90 or msg_type == 0x80:
-                    note = int(data[1]) & 0x7F
-                    vel = int(data[2]) & 0x7F
+                    note = d1
+                    vel = d2
                     is_on = (msg_type == 0x90) and (vel > 0)
-                    self._note_queue.append(
-                        MidiNote(channel=ch, note=note, velocity=vel, is_on=is_on, t=now_t)
+                    queue_note(
+                        MidiNote(channel=ch, note=note, velocity=vel, is_on=is_on, t=msg_t)
                     )
 
                 if msg_type != 0xB0:
                     continue
 
-                out.append(
+                emit_cc(
                     MidiCC(
                         channel=ch,
-                        control=int(data[1]) & 0x7F,
-                        value=int(data[2]) & 0x7F,
-                        t=now_t,
+                        control=d1,
+                        value=d2,
+                        t=msg_t,
                     )
                 )
         except Exception:
             return out
         return out
 
-    def drain_notes(self) -> List[MidiNote]:
-        """Drain queued note events."""
+    def drain_notes(self) -> Sequence[MidiNote]:
+        """
+        Drain queued note events.
+        The returned deque is reused by the next call, so consume it first.
+        """
         if not self._note_queue:
-            return []
+            return _NO_EVENTS
         out = self._note_queue
-        self._note_queue = []
+        self._note_queue = self._spare_note_queue
+        self._note_queue.clear()
+        self._spare_note_queue = out
         return out
 
     def is_enabled(self) -> bool:
@@ -370,14 +501,15 @@ class MidiInput:
 
 class LinearTransform:
     """Maps 0..1 to [low, high] linearly."""
-    __slots__ = ("low", "high")
+    __slots__ = ("low", "high", "_span")
 
     def __init__(self, low: float, high: float):
         self.low = low
         self.high = high
+        self._span = high - low  # fixed per binding; one multiply-add per call
 
     def __call__(self, u: float) -> float:
-        return lerp(self.low, self.high, u)
+        return self.low + self._span * u
 
     def __repr__(self) -> str:
         return f"LinearTransform({self.low}, {self.high})"
@@ -385,17 +517,18 @@ class LinearTransform:
 
 class SigmoidTransform:
     """Applies a sigmoid curve then maps to [low, high]."""
-    __slots__ = ("threshold", "steepness", "low", "high")
+    __slots__ = ("threshold", "steepness", "low", "high", "_span")
 
     def __init__(self, low: float, high: float, threshold: float = 0.5, steepness: float = 10.0):
         self.low = low
         self.high = high
+        self._span = high - low
         self.threshold = threshold
         self.steepness = steepness
 
     def __call__(self, u: float) -> float:
         s = sigmoid01(u, threshold=self.threshold, steepness=self.steepness)
-        return lerp(self.low, self.high, s)
+        return self.low + self._span * s
 
     def __repr__(self) -> str:
         return f"SigmoidTransform({self.low}, {self.high}, thr={self.threshold}, k={self.steepness})"
@@ -462,15 +595,15 @@ class CCResolver:
             return clamp01(self._strategy(dict(self._per_channel)))
 
         if self._strategy == Strategy.MOST_RECENT_OF_ANY:
-            return cc_unit(self._last_value)
+            return _cc_unit_lookup(self._last_value)
 
         if self._strategy == Strategy.AVERAGE_OF_LAST_PER_CHANNEL:
             if not self._per_channel:
                 return None
             avg = sum(self._per_channel.values()) / len(self._per_channel)
-            return cc_unit(int(round(avg)))
+            return _cc_unit_lookup(int(round(avg)))
 
-        return cc_unit(self._last_value)
+        return _cc_unit_lookup(self._last_value)
 
     def reset(self) -> None:
         self._per_channel.clear()
@@ -503,6 +636,8 @@ class CCBinding:
         self.param = param
         self.transform = transform or IdentityTransform()
         self.resolver = CCResolver(strategy)
+        # Bound once here so the router doesn't re-resolve it per update
+        self._set_param = target.set_param
 
     def __repr__(self) -> str:
         return f"CCBinding(ccs={sorted(self.ccs)}, param={self.param!r}, transform={self.transform})"
@@ -519,44 +654,60 @@ class MidiRouter:
     def __init__(self, log_mode: str = "none"):
         self._bindings: List[CCBinding] = []
         self._cc_to_bindings: Dict[int, List[CCBinding]] = {}
+        self._mapped_ccs: FrozenSet[int] = frozenset()
         self.log_mode = log_mode
 
     def add(self, binding: CCBinding) -> None:
         self._bindings.append(binding)
         for cc_num in binding.ccs:
             self._cc_to_bindings.setdefault(cc_num, []).append(binding)
+        self._mapped_ccs = frozenset(self._cc_to_bindings)
+
+    @property
+    def log_mode(self) -> str:
+        return self._log_mode
+
+    @log_mode.setter
+    def log_mode(self, mode: str) -> None:
+        # Resolved to flags here rather than on every process() call
+        self._log_mode = mode
+        self._log_all = mode in ("all", "both")
+        self._log_mapped = mode in ("mapped", "both")
 
     @property
-    def mapped_ccs(self) -> set:
-        """All CC numbers that have at least one binding."""
-        return set(self._cc_to_bindings.keys())
+    def mapped_ccs(self) -> FrozenSet[int]:
+        """All CC numbers that have at least one binding (rebuilt only by add())."""
+        return self._mapped_ccs
 
-    def process(self, cc_msgs: List[MidiCC]) -> None:
+    def process(self, cc_msgs: Sequence[MidiCC]) -> None:
         """Feed CC messages through bindings and push resolved values to effects."""
         if not cc_msgs:
             return
 
-        log_all = self.log_mode in ("all", "both")
-        log_mapped = self.log_mode in ("mapped", "both")
-        mapped_controls = self.mapped_ccs
+        log_all = self._log_all
+        log_mapped = self._log_mapped
+        # CC number -> bindings; a miss in this one lookup means "unmapped"
+        cc_to_bindings = self._cc_to_bindings
 
         touched_bindings: set = set()
+        # Log lines for this batch, emitted together as one record at the end
+        log_lines: List[str] = []
 
         for cc in cc_msgs:
-            is_mapped = cc.control in mapped_controls
+            bindings = cc_to_bindings.get(cc.control)
             if log_all:
-                tag = "mapped" if is_mapped else "unmapped"
-                print(f"[midi] {tag} t={cc.t:7.3f}s ch={cc.channel:2d} cc={cc.control:3d} val={cc.value:3d}")
+                tag = "mapped" if bindings is not None else "unmapped"
+                log_lines.append(f"[midi] {tag} t={cc.t:7.3f}s ch={cc.channel:2d} cc={cc.control:3d} val={cc.value:3d}")
 
-            if is_mapped:
-                for binding in self._cc_to_bindings[cc.control]:
+            if bindings is not None:
+                for binding in bindings:
                     binding.resolver.feed(cc)
                     touched_bindings.add(id(binding))
 
         if log_mapped and touched_bindings:
-            count = sum(1 for cc in cc_msgs if cc.control in mapped_controls)
-            controls = sorted({cc.control for cc in cc_msgs if cc.control in mapped_controls})
-            print(
+            count = sum(1 for cc in cc_msgs if cc.control in cc_to_bindings)
+            controls = sorted({cc.control for cc in cc_msgs if cc.control in cc_to_bindings})
+            log_lines.append(
                 f"[midi] mapped CC detected ({count} msg{'s' if count != 1 else ''}) "
                 f"controls={controls}"
             )
@@ -568,9 +719,12 @@ class MidiRouter:
             if unit is None:
                 continue
             value = binding.transform(unit)
-            binding.target.set_param(binding.param, value)
+            binding._set_param(binding.param, value)
             if log_mapped:
-                print(f"[midi] {binding.param} -> {value:.3f}")
+                log_lines.append(f"[midi] {binding.param} -> {value:.3f}")
+
+        if log_lines:
+            _log.info("%s", "\n".join(log_lines))
 
     def describe(self) -> str:
         """Human-readable summary of all bindings (for startup logging)."""
@@ -6,6 +6,8 @@ import math
 import random
 from typing import List, Optional, Tuple
 
+import numpy as np
+
 from effect import Effect, Param
 from midi import MidiNote
 
@@ -40,6 +42,23 @@ def _clamp01(x: float) -> float:
     return float(x)
 
 
+def _make_layer_drift() -> Tuple[Tuple[float, float, float, float], ...]:
+    drift = []
+    for i in range(N_LAYERS):
+        rng = random.Random((i + 1) * 15485863)
+        drift.append((
+            rng.uniform(-0.35, 0.35),
+            rng.uniform(0.08, 0.24),
+            rng.uniform(0.03, 0.09),
+            rng.uniform(0.02, 0.06),
+        ))
+    return tuple(drift)
+
+
+# Each layer's RNG is seeded from its index, so the drift never changes: build it once.
+_LAYER_DRIFT = _make_layer_drift()
+
+
 def _scale_color(rgb: Tuple[int, int, int], s: float) -> Tuple[int, int, int]:
     if s <= 0.0:
         return (0, 0, 0)
@@ -61,23 +80,17 @@ class MultiSinwavesEffect(Effect):
         super().__init__(width, height)
         self._held_pc_counts: List[int] = [0] * N_LAYERS
         self._last_matrix_size: Optional[Tuple[int, int]] = None
-        self._layer_drift: List[Tuple[float, float, float, float]] = [(0.0, 0.0, 0.0, 0.0)] * N_LAYERS
+        self._x_coords: Optional[np.ndarray] = None
+        self._layer_drift: Tuple[Tuple[float, float, float, float], ...] = ((0.0, 0.0, 0.0, 0.0),) * N_LAYERS
 
     def _reset_layer_drift(self) -> None:
-        self._layer_drift = []
-        for i in range(N_LAYERS):
-            rng = random.Random((i + 1) * 15485863)
-            self._layer_drift.append((
-                rng.uniform(-0.35, 0.35),
-                rng.uniform(0.08, 0.24),
-                rng.uniform(0.03, 0.09),
-                rng.uniform(0.02, 0.06),
-            ))
+        self._layer_drift = _LAYER_DRIFT
 
     def setup(self, matrix) -> None:
         self.width = int(matrix.width)
         self.height = int(matrix.height)
         self._last_matrix_size = (self.width, self.height)
+        self._x_coords = np.arange(self.width, dtype=np.float64)
         self._reset_layer_drift()
 
     def activate(self) -> None:
@@ -85,11 +98,9 @@ class MultiSinwavesEffect(Effect):
         self._reset_layer_drift()
 
     def handle_note(self, note: MidiNote) -> None:
-        try:
-            n = int(getattr(note, "note", -1))
-            is_on = bool(getattr(note, "is_on", False))
-        except Exception:
-            return
+        # Errors propagate to the main loop, which logs them once per note batch
+        n = note.note
+        is_on = note.is_on
         if not (0 <= n <= 127):
             return
         pc = n % N_LAYERS
@@ -119,6 +130,7 @@ class MultiSinwavesEffect(Effect):
         speed2 = 1.6
         center_x = 0.5 * float(w - 1)
         min_perspective_scale = 0.28
+        xs = self._x_coords
 
         for i in range(N_LAYERS - 1, -1, -1):
             d = 0.0 if N_LAYERS <= 1 else (i / (N_LAYERS - 1))
@@ -151,16 +163,18 @@ class MultiSinwavesEffect(Effect):
 
             perspective_scale = _lerp(1.0, min_perspective_scale, d)
             inv_scale = 1.0 / perspective_scale
-            for x_screen in range(w):
-                x_projected = center_x + ((float(x_screen) - center_x) * inv_scale)
-                y = y_base + (
-                    amp1 * math.sin((freq1 * x_projected) + phase1)
-                ) + (
-                    amp2 * math.sin((freq2 * x_projected) + phase2)
-                )
-                yi = int(round(y))
-                if 0 <= yi < h:
-                    canvas.SetPixel(x_screen, yi, r, g, b)
+
+            # Every column of the layer in one pass; rint matches round()'s half-to-even.
+            x_projected = center_x + ((xs - center_x) * inv_scale)
+            y = y_base + (
+                amp1 * np.sin((freq1 * x_projected) + phase1)
+            ) + (
+                amp2 * np.sin((freq2 * x_projected) + phase2)
+            )
+            yi = np.rint(y).astype(np.intp)
+            cols = np.flatnonzero((yi >= 0) & (yi < h))
+            for x_screen, y_screen in zip(cols.tolist(), yi[cols].tolist()):
+                canvas.SetPixel(x_screen, y_screen, r, g, b)
 
 
 # ---------------------------------------------------------------------------
@@ -188,10 +202,10 @@ if __name__ == "__main__":
     effect = MultiSinwavesEffect(matrix.width, matrix.height)
     effect.setup(matrix)
     effect.activate()
-    start = time.time()
+    start = time.monotonic()
     try:
         while True:
-            t = time.time() - start
+            t = time.monotonic() - start
             canvas.Clear()
             effect.draw(canvas, matrix, t)
             canvas = matrix.SwapOnVSync(canvas)
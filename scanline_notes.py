@@ -51,6 +51,8 @@ def _color_for_note(
     return (base, sat)
 
 class ScanlineNotesEffect(Effect):
+    CLEARS_CANVAS = True  # draw() starts with canvas.Clear()
+
     def __init__(self, width: int, height: int, verbose: bool = False):
         super().__init__(width, height)
         self._verbose = verbose
@@ -83,41 +85,37 @@ class ScanlineNotesEffect(Effect):
             print("[Scanline] Effect activated.")
 
     def handle_note(self, note: MidiNote) -> None:
-        try:
-            n = int(getattr(note, "note", -1))
-            velocity = int(getattr(note, "velocity", 0))
-            is_on = bool(getattr(note, "is_on", False))
-            channel = int(getattr(note, "channel", 1))  # 1-16
-
-            # Standard MIDI handling: velocity 0 often means note off
-            if velocity == 0:
-                is_on = False
-                
-            if not (0 <= n <= 127):
-                return
-
-            slot = n % self._n_slots
-            current_phase = self._get_current_phase(self._last_t)
+        # Errors propagate to the main loop, which logs them once per note batch
+        n = note.note
+        velocity = note.velocity
+        is_on = note.is_on
+        channel = note.channel  # 1-16
+
+        # Standard MIDI handling: velocity 0 often means note off
+        if velocity == 0:
+            is_on = False
             
-            status_str = "ON" if is_on else "OFF"
-            if self._verbose:
-                print(f"[Scanline] Note {n} ({status_str}) ch={channel} -> Slot {slot} (Phase: {current_phase:.3f})")
+        if not (0 <= n <= 127):
+            return
+
+        slot = n % self._n_slots
+        current_phase = self._get_current_phase(self._last_t)
+        
+        status_str = "ON" if is_on else "OFF"
+        if self._verbose:
+            print(f"[Scanline] Note {n} ({status_str}) ch={channel} -> Slot {slot} (Phase: {current_phase:.3f})")
 
-            if is_on:
-                self._active_note_phases[slot].append((current_phase, None, None, channel, n))
+        if is_on:
+            self._active_note_phases[slot].append((current_phase, None, None, channel, n))
+        else:
+            # Mark the first still-held note as released (freeze bar end at current phase, start fade)
+            for i, (p, t_off, _, ch, note) in enumerate(self._active_note_phases[slot]):
+                if t_off is None:
+                    self._active_note_phases[slot][i] = (p, self._last_t, current_phase, ch, note)
+                    break
             else:
-                # Mark the first still-held note as released (freeze bar end at current phase, start fade)
-                for i, (p, t_off, _, ch, note) in enumerate(self._active_note_phases[slot]):
-                    if t_off is None:
-                        self._active_note_phases[slot][i] = (p, self._last_t, current_phase, ch, note)
-                        break
-                else:
-                    if self._verbose:
-                        print(f"[Scanline] Warning: Received OFF for slot {slot} but no active notes found.")
-                    
-        except Exception as e:
-            if self._verbose:
-                print(f"[Scanline] Error handling note: {e}")
+                if self._verbose:
+                    print(f"[Scanline] Warning: Received OFF for slot {slot} but no active notes found.")
 
     def set_sweep_phase(self, phase: Optional[float]) -> None:
         self._external_sweep_phase = phase
@@ -161,6 +161,7 @@ class StarfieldEffect(Effect):
         self._pixel_state = np.zeros((self.height, self.width, 3), dtype=np.uint8)
         self._stars = [Star(self.width, self.height) for _ in range(self._num_stars)]
         self._last_t_point = None
+        self._debug_last_draw_log_t = -1e9
 
     def activate(self) -> None:
         self._last_t_point = None
@@ -173,8 +174,8 @@ class StarfieldEffect(Effect):
             self.setup(matrix)
             assert self._stars is not None and self._pixel_state is not None
 
-        speed_mult = self.get_param("speed")
-        color_amount = self.get_param("color_amount")
+        speed_mult = self.speed
+        color_amount = self.color_amount
 
         if self._last_t_point is None:
             dt = 0.0
@@ -227,19 +228,19 @@ if __name__ == "__main__":
     effect.setup(matrix)
     effect.activate()
 
-    start_time = time.time()
+    frame_budget_ns = 1_000_000_000 // 60
+    start_ns = time.monotonic_ns()
     print("Starting starfield animation... Press CTRL-C to stop.")
     try:
         while True:
-            current_time = time.time()
+            frame_start_ns = time.monotonic_ns()
             canvas.Clear()
-            t_point = current_time - start_time
+            t_point = (frame_start_ns - start_ns) * 1e-9
             effect.draw(canvas, matrix, t_point)
             canvas = matrix.SwapOnVSync(canvas)
-            elapsed = time.time() - current_time
-            frame_time = 1.0 / 60
-            if elapsed < frame_time:
-                time.sleep(frame_time - elapsed)
+            elapsed_ns = time.monotonic_ns() - frame_start_ns
+            if elapsed_ns < frame_budget_ns:
+                time.sleep((frame_budget_ns - elapsed_ns) * 1e-9)
     except KeyboardInterrupt:
         print("\nExiting...")
         matrix.Clear()
@@ -1,7 +1,6 @@
 #!/usr/bin/env -S python3 -u
 
 import time
-import math
 from typing import Optional
 
 import numpy as np
@@ -35,6 +34,7 @@ class SinwaveEffect(Effect):
     def __init__(self, width: int, height: int):
         super().__init__(width, height)
         self.pixel_state: Optional[np.ndarray] = None
+        self._x_coords: Optional[np.ndarray] = None
         self._phase_accum = 0.0
         self._last_t_point: Optional[float] = None
         self._external_phase: Optional[float] = None
@@ -43,6 +43,7 @@ class SinwaveEffect(Effect):
         self.width = int(matrix.width)
         self.height = int(matrix.height)
         self.pixel_state = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._x_coords = np.arange(self.width, dtype=np.float64)
 
     def activate(self) -> None:
         self._phase_accum = 0.0
@@ -55,20 +56,11 @@ class SinwaveEffect(Effect):
             self._external_phase = None
             self._last_t_point = None
             return
-        try:
-            self._external_phase = float(phase)
-        except Exception:
-            return
+        self._external_phase = phase
 
     def set_wavelength_mult(self, mult: float) -> None:
         """Direct setter for MIDI clock spatial-wavelength sync."""
-        try:
-            m = float(mult)
-        except Exception:
-            return
-        if m < 0.01:
-            m = 0.01
-        self.params["wavelength"].value = m
+        self.wavelength = mult if mult >= 0.01 else 0.01
 
     # -- Rendering helpers ---------------------------------------------------
 
@@ -77,23 +69,14 @@ class SinwaveEffect(Effect):
             self.pixel_state.fill(0)
 
     @staticmethod
-    def _fast_color_dim(color, dim_factor):
-        return int(color[0] * dim_factor), int(color[1] * dim_factor), int(color[2] * dim_factor)
-
-    def _draw_pixels(self, canvas, x, y, c1, c2, c3, blend=True):
-        ps = self.pixel_state
-        if blend and ps is not None:
-            cur = ps[y, x]
-            r = max(int(cur[0]), c1)
-            g = max(int(cur[1]), c2)
-            b = max(int(cur[2]), c3)
-            ps[y, x] = [r, g, b]
-            canvas.SetPixel(x, y, r, g, b)
-            return (r, g, b)
-        if ps is not None:
-            ps[y, x] = [c1, c2, c3]
-        canvas.SetPixel(x, y, c1, c2, c3)
-        return (c1, c2, c3)
+    def _dim_ladder(colour, dim_factor, width):
+        """Centre colour plus one dimmed colour per soft-edge step."""
+        ladder = np.empty((max(1, width), 3), dtype=np.int64)
+        ladder[0] = colour
+        for w in range(1, width):
+            # Truncate each step, as int(c * dim_factor) per pixel used to
+            ladder[w] = ladder[w - 1] * dim_factor
+        return ladder.astype(np.uint8)
 
     @staticmethod
     def _lerp_color(c1, c2, t):
@@ -110,34 +93,53 @@ class SinwaveEffect(Effect):
     ):
         vertical_offset = matrix.height / 4 + width - 2
         phase = (t_point * speed) + phase_offset
+        ladder = self._dim_ladder(colour, dim_factor, width)
+
+        # All column centres in one vectorised sine; rint matches round()'s half-to-even.
+        ys = np.sin(self._x_coords * frequency + phase)
+        ys *= amplitude
+        ys += vertical_offset
+        y_centers = np.rint(ys).astype(np.intp)
+
+        # Every (column, offset) pixel of the line at once; offset 0 is the centre,
+        # |offset| picks the soft-edge colour from the ladder.
+        offsets = np.arange(1 - width, width)
+        px_y = y_centers[:, None] + offsets
+        on_screen = (px_y >= 0) & (px_y < matrix.height)
+        px_y = px_y[on_screen]
+        px_x = np.broadcast_to(np.arange(len(y_centers))[:, None], on_screen.shape)[on_screen]
+        px_rgb = ladder[np.broadcast_to(np.abs(offsets), on_screen.shape)[on_screen]]
 
-        for x in range(matrix.width):
-            y_center = round(amplitude * math.sin(frequency * x + phase) + vertical_offset)
-
-            if 0 <= y_center < matrix.height:
-                self._draw_pixels(canvas, x, y_center, colour[0], colour[1], colour[2], blend=blend)
+        ps = self.pixel_state
+        if blend:
+            px_rgb = np.maximum(ps[px_y, px_x], px_rgb)
+        ps[px_y, px_x] = px_rgb
 
-            soft_colour = colour
-            for w in range(1, width):
-                soft_colour = self._fast_color_dim(soft_colour, dim_factor)
-                if y_center - w >= 0:
-                    self._draw_pixels(canvas, x, y_center - w, soft_colour[0], soft_colour[1], soft_colour[2], blend=blend)
-                if y_center + w < matrix.height:
-                    self._draw_pixels(canvas, x, y_center + w, soft_colour[0], soft_colour[1], soft_colour[2], blend=blend)
+        for x, y, (r, g, b) in zip(px_x.tolist(), px_y.tolist(), px_rgb.tolist()):
+            canvas.SetPixel(x, y, r, g, b)
 
     def _draw_vertical_bar(self, canvas, matrix, colour, x_centre_factor=0.3, width=4, dim_factor=0.6, blend=True):
         ps = self.pixel_state
-        for y in range(matrix.height):
-            x_centre = int(x_centre_factor * matrix.width)
-            self._draw_pixels(canvas, x_centre, y, colour[0], colour[1], colour[2], blend=blend)
-
-            soft_colour = colour
-            for w in range(1, width):
-                soft_colour = self._fast_color_dim(soft_colour, dim_factor)
-                if x_centre + w < matrix.width:
-                    self._draw_pixels(canvas, x_centre + w, y, soft_colour[0], soft_colour[1], soft_colour[2], blend=blend)
-                if x_centre - w >= 0:
-                    self._draw_pixels(canvas, x_centre - w, y, soft_colour[0], soft_colour[1], soft_colour[2], blend=blend)
+        x_centre = int(x_centre_factor * matrix.width)
+        lo = max(0, x_centre - (width - 1))
+        hi = min(matrix.width, x_centre + width)
+        if lo >= hi:
+            return
+
+        ladder = self._dim_ladder(colour, dim_factor, width)
+
+        # One row of the bar (centre + soft edges); broadcast down every row
+        # so the max-blend runs as a single array op over the whole strip.
+        stripe = ladder[np.abs(np.arange(lo, hi) - x_centre)]
+        strip = ps[:, lo:hi]
+        if blend:
+            np.maximum(strip, stripe, out=strip)
+        else:
+            strip[:] = stripe
+
+        for y, row in enumerate(strip.tolist()):
+            for x, (r, g, b) in enumerate(row, lo):
+                canvas.SetPixel(x, y, r, g, b)
 
     # -- Main draw -----------------------------------------------------------
 
@@ -146,7 +148,7 @@ class SinwaveEffect(Effect):
             self.setup(matrix)
 
         if colour is None:
-            morph = self.get_param("color") / 127.0
+            morph = self.color / 127.0
             morph = max(0.0, min(1.0, morph))
             colour = self._lerp_color(self.COLOR_1, self.COLOR_2, morph)
 
@@ -163,13 +165,13 @@ class SinwaveEffect(Effect):
                     dt = self._MAX_DT
             self._last_t_point = t_point
 
-            speed = self._BASE_SPEED * self.get_param("speed")
+            speed = self._BASE_SPEED * self.speed
             self._phase_accum += speed * dt
             phase_for_draw = self._phase_accum
         else:
             phase_for_draw = self._external_phase
 
-        wl = self.get_param("wavelength")
+        wl = self.wavelength
         if wl < 0.0001:
             wl = 0.0001
         frequency = self._BASE_FREQUENCY / wl
@@ -177,7 +179,7 @@ class SinwaveEffect(Effect):
         self._draw_sine_wave(
             canvas, matrix, phase_for_draw,
             colour=colour, frequency=frequency, speed=1.0,
-            phase_offset=self.get_param("phase_offset"), blend=False,
+            phase_offset=self.phase_offset, blend=False,
         )
         self._draw_vertical_bar(canvas, matrix, colour, blend=True)
 
@@ -207,12 +209,12 @@ if __name__ == "__main__":
     effect.setup(matrix)
     effect.activate()
 
-    start_time = time.time()
+    start_time = time.monotonic()
     print("Starting sine wave animation... Press CTRL-C to stop.")
     try:
         while True:
             canvas.Clear()
-            t_point = time.time() - start_time
+            t_point = time.monotonic() - start_time
             effect.draw(canvas, matrix, t_point)
             canvas = matrix.SwapOnVSync(canvas)
     except KeyboardInterrupt:
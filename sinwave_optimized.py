@@ -230,7 +230,7 @@ if __name__ == "__main__":
     # Initialize the pixel state array
     init_pixel_state(matrix.height, matrix.width)
 
-    start_time = time.time()
+    start_time = time.monotonic()
 
     print("Starting optimized sine wave animation... Press CTRL-C to stop.")
     try:
@@ -238,7 +238,7 @@ if __name__ == "__main__":
             colour = [50, 50, 255]
             canvas.Clear()
             clear_pixel_state()  # Reset our pixel state when clearing canvas
-            t_point = time.time() - start_time
+            t_point = time.monotonic() - start_time
             draw_sine_wave(canvas, matrix, t_point, colour=colour, frequency=0.15, blend=False)
             draw_vertical_bar(canvas, matrix, colour, blend=True)
             
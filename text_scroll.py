@@ -42,10 +42,16 @@ class TextScrollEffect(Effect):
 
         # rgbmatrix.graphics (Pi) state
         self._native_font = None
+        self._graphics = None  # rgbmatrix.graphics, kept from font loading for draw()
         self._use_native_font = False
         self._cached_native_msg_w: Optional[int] = None
         self._native_font_height = 13
 
+        # (offset, r, g, b) of the last frame drawn, for skipping unchanged frames
+        self._last_frame_key: Optional[Tuple[int, int, int, int]] = None
+        # (t_point, key) from the latest frame_unchanged() check, reused by draw()
+        self._checked_frame: Optional[Tuple[float, Tuple[int, int, int, int]]] = None
+
     # -- Font loading --------------------------------------------------------
 
     def _try_load_native_font(self) -> bool:
@@ -77,6 +83,7 @@ class TextScrollEffect(Effect):
                 try:
                     font.LoadFont(path)
                     self._native_font = font
+                    self._graphics = graphics
                     self._use_native_font = True
                     if "9x15" in path or "9x18" in path:
                         self._native_font_height = 15
@@ -153,7 +160,7 @@ class TextScrollEffect(Effect):
         return (255, 0, int(255 * (1 - f)))
 
     def _text_color(self, t_point: float) -> Tuple[int, int, int]:
-        cc_val = self.get_param("color")
+        cc_val = self.color
         u = max(0.0, min(1.0, cc_val / 127.0))
         white = (255, 255, 255)
         hue = (t_point * 0.5 + cc_val / 127.0) % 1.0
@@ -166,7 +173,7 @@ class TextScrollEffect(Effect):
     def _scroll_phase_px(self, t_point: float) -> float:
         if self._external_scroll_phase is not None:
             return self._external_scroll_phase
-        return t_point * 2.4 * self.get_param("speed")
+        return t_point * 2.4 * self.speed
 
     # -- Public interface for clock sync -------------------------------------
 
@@ -177,6 +184,7 @@ class TextScrollEffect(Effect):
     def set_text(self, msg: str) -> None:
         self._message = str(msg) if msg else " "
         self._cached_native_msg_w = None
+        self._last_frame_key = None
 
     # -- Lifecycle -----------------------------------------------------------
 
@@ -187,39 +195,62 @@ class TextScrollEffect(Effect):
         self._try_load_native_font()
 
     def activate(self) -> None:
-        pass
+        self._last_frame_key = None
 
     # -- Draw ----------------------------------------------------------------
 
-    def draw(self, canvas, matrix, t_point: float) -> None:
+    def _uses_native_font(self, canvas) -> bool:
+        return self._use_native_font and self._native_font is not None and not hasattr(canvas, "_buffer")
+
+    def _frame_key(self, canvas, matrix, t_point: float) -> Tuple[int, int, int, int]:
+        """(scroll offset, r, g, b) at *t_point*: everything the drawn pixels depend on."""
         w = matrix.width
-        h = matrix.height
         r, g, b = self._text_color(t_point)
         phase_px = self._scroll_phase_px(t_point)
+        if self._uses_native_font(canvas):
+            msg_w = self._cached_native_msg_w or (w * 2)
+            return (w - (int(phase_px) % (msg_w + w)), r, g, b)
+        self._render_message()
+        return (int(phase_px) % (self._cached_w + w), r, g, b)
+
+    def frame_unchanged(self, canvas, matrix, t_point: float) -> bool:
+        key = self._frame_key(canvas, matrix, t_point)
+        self._checked_frame = (t_point, key)
+        return key == self._last_frame_key
+
+    def draw(self, canvas, matrix, t_point: float) -> None:
+        w = matrix.width
+        h = matrix.height
+        checked = self._checked_frame
+        if checked is not None and checked[0] == t_point:
+            key = checked[1]
+        else:
+            key = self._frame_key(canvas, matrix, t_point)
+        self._last_frame_key = key
+        offset, r, g, b = key
 
         # Pi: use rgbmatrix.graphics + BDF
-        if self._use_native_font and self._native_font is not None and not hasattr(canvas, "_buffer"):
+        if self._uses_native_font(canvas):
             try:
-                from rgbmatrix import graphics
-                msg_w = self._cached_native_msg_w or (w * 2)
-                cycle = msg_w + w
-                px_offset = w - (int(phase_px) % cycle)
+                graphics = self._graphics
                 y0 = max(0, (h - self._native_font_height) // 2)
                 color = graphics.Color(r, g, b)
-                text_w = graphics.DrawText(canvas, self._native_font, px_offset, y0 + self._native_font_height - 1, color, self._message)
+                text_w = graphics.DrawText(canvas, self._native_font, offset, y0 + self._native_font_height - 1, color, self._message)
                 if self._cached_native_msg_w is None:
                     self._cached_native_msg_w = text_w
                 return
             except Exception:
-                pass
+                # Stay on the PIL path from now on; its offset is keyed differently
+                self._use_native_font = False
+                self._last_frame_key = key = self._frame_key(canvas, matrix, t_point)
+                offset = key[0]
 
         # Fallback: PIL
         self._render_message()
         if self._cached_img is None:
             return
         msg_w = self._cached_w
-        cycle = msg_w + w
-        src_x = int(phase_px) % cycle
+        src_x = offset
         img = self._cached_img
         iw, ih = img.size
         y0 = max(0, (h - ih) // 2)